@@ -1,21 +1,63 @@
-from locust import HttpUser, task, between, constant, SequentialTaskSet, events
+from locust import task, between, SequentialTaskSet, events
+from locust.contrib.fasthttp import FastHttpUser
 import random
 import string
 import logging
+import logging.handlers
+import queue
+import atexit
 import json
-import os
-from datetime import datetime
+import time
+import itertools
+import collections
 from pathlib import Path
+from urllib.parse import urlencode
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('bdd_load_test.log'),
-        logging.StreamHandler()
-    ]
-)
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # Fall back to the stdlib parser
+    _json_loads = json.loads
+
+class BufferedFileHandler(logging.FileHandler):
+    """FileHandler writing through a 64 KiB buffer instead of flushing per record"""
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=65536, encoding=self.encoding)
+
+    def flush(self):
+        # Buffer is flushed when full and on close()
+        pass
+
+# Configure file logging: records are enqueued on the hot path and a
+# QueueListener drains them into a buffered file, so writes are batched rather
+# than flushed per record. Locust monkey-patches threading and queue, so the
+# listener runs as a greenlet on the load generator's thread, not an OS thread.
+# Console output is left to Locust's own log handlers.
+_file_handler = BufferedFileHandler('bdd_load_test.log')
+_file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, _file_handler)
+
+# QueueHandler pre-formats records; keep only the message so the listener's
+# formatter is applied exactly once
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
+@events.init.add_listener
+def on_locust_init(environment, **kwargs):
+    """Attach file logging once Locust has configured the root logger"""
+    # Locust's logging setup replaces the root handlers after importing this
+    # file, so the handler can only be added from here
+    logging.getLogger().addHandler(_queue_handler)
+    _log_listener.start()
+    atexit.register(_stop_log_listener)
+
+def _stop_log_listener():
+    _log_listener.stop()
+    _file_handler.close()
+
+logger = logging.getLogger(__name__)
 
 # Test configuration
 class TestConfig:
@@ -23,48 +65,74 @@ class TestConfig:
     MIN_REQUESTS = 10      # Minimum number of requests to consider test valid
     MAX_RESPONSE_TIME = 2000  # Maximum allowed response time in milliseconds
     REPORT_DIR = "load_test_reports"
+    USER_POOL_SIZE = 10000  # Number of pre-generated registration payloads
 
-class Statistics:
-    def __init__(self):
-        self.total_requests = 0
-        self.failed_requests = 0
-        self.max_response_time = 0
-        self.start_time = datetime.now()
-        
-    @property
-    def failure_percentage(self):
-        if self.total_requests == 0:
-            return 0
-        return (self.failed_requests / self.total_requests) * 100
+# Created once at import; report writers only reference this path
+REPORT_DIR_PATH = Path(TestConfig.REPORT_DIR)
+REPORT_DIR_PATH.mkdir(exist_ok=True)
+
+# Dedicated RNG with bound methods to skip the random module's global lookups
+_rng = random.Random()
+_choices = _rng.choices
+_randrange = _rng.randrange
+
+def _make_user(random_string, phone):
+    return {
+        'fullName': f'Test User {random_string}',
+        'userName': f'testuser_{random_string}',
+        'email': f'test_{random_string}@example.com',
+        'password': f'password_{random_string}',
+        'phone': phone
+    }
+
+def _build_user_pool(size, length=8):
+    """Pre-generate registration payloads so no RNG work happens per task"""
+    letters = ''.join(_choices(string.ascii_lowercase, k=length * size))
+    digits = ''.join(_choices(string.digits, k=10 * size))
+    keys = [letters[i * length:(i + 1) * length] for i in range(size)]
+    pool = [_make_user(keys[i], digits[i * 10:(i + 1) * 10]) for i in range(size)]
+    return keys, pool
+
+_POOL_KEYS, _USER_POOL = _build_user_pool(TestConfig.USER_POOL_SIZE)
+
+_FORM_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded'}
 
 class UserBehavior(SequentialTaskSet):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.registered_users = []
-        self.stats = Statistics()
-        
-    def generate_random_string(self, length=8):
-        return ''.join(random.choices(string.ascii_lowercase, k=length))
-    
+    # Shared across users so each registration draws a distinct pool entry
+    _pool_iter = itertools.count()
+    # Shared across users so any user can log in with another's registration;
+    # deque appends are atomic under the GIL and stale reads are acceptable here
+    registered_users = collections.deque(maxlen=1024)
+
     def generate_random_user(self):
-        random_string = self.generate_random_string()
+        # Hand out the pre-generated pool instead of building a payload per task
+        lap, index = divmod(next(self._pool_iter), len(_USER_POOL))
+        if not lap:
+            return _USER_POOL[index]
+        # Pool has wrapped: suffix the lap number so every registration stays unique
+        return _make_user(f'{_POOL_KEYS[index]}{lap}', _USER_POOL[index]['phone'])
+    
+    def build_login_record(self, user_data):
+        # Encode login bodies once so login tasks can post them as-is; kept
+        # separate from the pooled registration payload, which is reused
         return {
-            'fullName': f'Test User {random_string}',
-            'userName': f'testuser_{random_string}',
-            'email': f'test_{random_string}@example.com',
-            'password': f'password_{random_string}',
-            'phone': ''.join(random.choices(string.digits, k=10))
+            'email': user_data['email'],
+            'userName': user_data['userName'],
+            '_login_email_body': urlencode({
+                'userName': '',
+                'email': user_data['email'],
+                'password': user_data['password']
+            }).encode(),
+            '_login_user_body': urlencode({
+                'userName': user_data['userName'],
+                'email': '',
+                'password': user_data['password']
+            }).encode()
         }
     
     def log_scenario(self, scenario, status, details=""):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        message = f"[{timestamp}] Scenario: {scenario} | Status: {status} | Details: {details}"
-        logging.info(message)
-        
-        # Update statistics
-        self.stats.total_requests += 1
-        if status in ["FAIL", "ERROR"]:
-            self.stats.failed_requests += 1
+        # Timestamp comes from the formatter; %-args are only formatted if INFO is enabled
+        logger.info("Scenario: %s | Status: %s | Details: %s", scenario, status, details)
     
     @task
     def scenario_register_new_user(self):
@@ -82,20 +150,18 @@ class UserBehavior(SequentialTaskSet):
                             catch_response=True,
                             name="1. Register New User") as response:
             try:
-                if response.json()['msg'] == 'User Registered':
+                body = _json_loads(response.content)
+                if body.get('msg') == 'User Registered':
                     self.log_scenario("Registration", "SUCCESS", f"User: {user_data['email']}")
                     response.success()
-                    self.registered_users.append(user_data)
+                    self.registered_users.append(self.build_login_record(user_data))
                 else:
                     self.log_scenario("Registration", "FAIL", 
-                                    f"User: {user_data['email']}, Error: {response.json()['msg']}")
-                    response.failure(response.json()['msg'])
+                                    f"User: {user_data['email']}, Error: {body.get('msg', 'Registration failed')}")
+                    response.failure(body.get('msg', 'Registration failed'))
             except Exception as e:
                 self.log_scenario("Registration", "ERROR", str(e))
                 response.failure(f"Invalid response: {str(e)}")
-            
-            # Track response time
-            self.stats.max_response_time = max(self.stats.max_response_time, response.elapsed.total_seconds() * 1000)
 
     @task
     def scenario_login_with_email(self):
@@ -105,28 +171,24 @@ class UserBehavior(SequentialTaskSet):
             return
             
         # Given: A registered user's credentials
-        user = random.choice(self.registered_users)
+        user = self.registered_users[_randrange(len(self.registered_users))]
         
         # When: Attempting to login with email
-        payload = {
-            'userName': '',
-            'email': user['email'],
-            'password': user['password']
-        }
-        
         with self.client.post("/client_login", 
-                            data=payload, 
+                            data=user['_login_email_body'], 
+                            headers=_FORM_HEADERS,
                             catch_response=True,
                             name="2. Login with Email") as response:
             try:
                 # Then: Login should be successful and return a token
-                if 'token' in response.json():
+                body = _json_loads(response.content)
+                if 'token' in body:
                     self.log_scenario("Login with Email", "SUCCESS", f"User: {user['email']}")
                     response.success()
                 else:
                     self.log_scenario("Login with Email", "FAIL", 
-                                    f"User: {user['email']}, Error: {response.json().get('msg', 'Unknown error')}")
-                    response.failure(response.json().get('msg', 'Login failed'))
+                                    f"User: {user['email']}, Error: {body.get('msg', 'Unknown error')}")
+                    response.failure(body.get('msg', 'Login failed'))
             except Exception as e:
                 self.log_scenario("Login with Email", "ERROR", str(e))
                 response.failure(f"Invalid response: {str(e)}")
@@ -139,58 +201,64 @@ class UserBehavior(SequentialTaskSet):
             return
             
         # Given: A registered user's credentials
-        user = random.choice(self.registered_users)
+        user = self.registered_users[_randrange(len(self.registered_users))]
         
         # When: Attempting to login with username
-        payload = {
-            'userName': user['userName'],
-            'email': '',
-            'password': user['password']
-        }
-        
         with self.client.post("/client_login", 
-                            data=payload, 
+                            data=user['_login_user_body'], 
+                            headers=_FORM_HEADERS,
                             catch_response=True,
                             name="3. Login with Username") as response:
             try:
                 # Then: Login should be successful and return a token
-                if 'token' in response.json():
+                body = _json_loads(response.content)
+                if 'token' in body:
                     self.log_scenario("Login with Username", "SUCCESS", f"User: {user['userName']}")
                     response.success()
                 else:
                     self.log_scenario("Login with Username", "FAIL", 
-                                    f"User: {user['userName']}, Error: {response.json().get('msg', 'Unknown error')}")
-                    response.failure(response.json().get('msg', 'Login failed'))
+                                    f"User: {user['userName']}, Error: {body.get('msg', 'Unknown error')}")
+                    response.failure(body.get('msg', 'Login failed'))
             except Exception as e:
                 self.log_scenario("Login with Username", "ERROR", str(e))
                 response.failure(f"Invalid response: {str(e)}")
 
-def generate_junit_report(stats):
-    """Generate JUnit XML report for CI/CD integration"""
-    report_dir = Path(TestConfig.REPORT_DIR)
-    report_dir.mkdir(exist_ok=True)
-    
-    junit_template = f"""<?xml version="1.0" encoding="UTF-8"?>
+_JUNIT_TMPL = """<?xml version="1.0" encoding="UTF-8"?>
 <testsuites>
-    <testsuite name="Load Test Results" tests="{stats.total_requests}" failures="{stats.failed_requests}">
+    <testsuite name="Load Test Results" tests="{tests}" failures="{failures}">
         <testcase name="Performance Requirements" classname="LoadTest">
-            {'<failure message="Failed performance requirements"/>'}
+            {failure_tag}
         </testcase>
     </testsuite>
 </testsuites>"""
+
+_JUNIT_FAILURE_TAG = '<failure message="Failed performance requirements"/>'
+
+def generate_junit_report(stats, failed):
+    """Generate JUnit XML report for CI/CD integration"""
+    junit_report = _JUNIT_TMPL.format(
+        tests=stats.num_requests,
+        failures=stats.num_failures,
+        failure_tag=_JUNIT_FAILURE_TAG if failed else ''
+    )
     
-    with open(report_dir / "load_test_results.xml", "w") as f:
-        f.write(junit_template)
+    (REPORT_DIR_PATH / "load_test_results.xml").write_text(junit_report)
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    """Record the monotonic start time used for the report's test duration"""
+    environment._t0 = time.monotonic()
 
 @events.quitting.add_listener
 def on_test_end(environment, **kwargs):
     """Handle test completion and generate reports"""
     if not environment.stats.total.num_requests:
-        logging.error("No requests were made during the test!")
+        logger.error("No requests were made during the test!")
         environment.process_exit_code = 1
         return
     
     # Calculate test results
+    duration_sec = time.monotonic() - environment._t0
     failure_percent = (environment.stats.total.num_failures / environment.stats.total.num_requests) * 100
     avg_response_time = environment.stats.total.avg_response_time
     
@@ -200,19 +268,11 @@ def on_test_end(environment, **kwargs):
         "failed_requests": environment.stats.total.num_failures,
         "failure_percentage": failure_percent,
         "average_response_time": avg_response_time,
-        "test_duration": str(datetime.now() - environment.runner.stats.start_time)
+        "test_duration_seconds": duration_sec
     }
     
-    # Create report directory
-    report_dir = Path(TestConfig.REPORT_DIR)
-    report_dir.mkdir(exist_ok=True)
-    
-    # Save JSON report
-    with open(report_dir / "load_test_report.json", "w") as f:
-        json.dump(report, f, indent=2)
-    
-    # Generate JUnit report
-    generate_junit_report(environment.stats.total)
+    # Save JSON report, serialized in memory and written in one call
+    (REPORT_DIR_PATH / "load_test_report.json").write_text(json.dumps(report, indent=2))
     
     # Determine test success/failure
     failed = (
@@ -221,14 +281,23 @@ def on_test_end(environment, **kwargs):
         environment.stats.total.num_requests < TestConfig.MIN_REQUESTS
     )
     
+    # Generate JUnit report
+    generate_junit_report(environment.stats.total, failed)
+    
     if failed:
-        logging.error("Load test failed to meet requirements!")
+        logger.error("Load test failed to meet requirements!")
         environment.process_exit_code = 1
     else:
-        logging.info("Load test completed successfully!")
+        logger.info("Load test completed successfully!")
         environment.process_exit_code = 0
 
-class WebsiteUser(HttpUser):
-    wait_time = constant(1)
+# Seconds each virtual user pauses between tasks. This pacing is intentional
+# (user simulation rather than peak RPS); set to 0.0 for maximum throughput.
+_WAIT = 1.0
+
+class WebsiteUser(FastHttpUser):
+    # geventhttpclient-backed client: keeps connections alive and pools them
+    # per user by default, so no adapter tuning is needed
+    wait_time = lambda self: _WAIT
     fixed_count = 10
-    tasks = [UserBehavior] 
\ No newline at end of file
+    tasks = [UserBehavior]